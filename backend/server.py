@@ -1,22 +1,38 @@
 """FastAPI server exposing AI agent endpoints."""
 
+import asyncio
 import logging
 import os
+import time
 import uuid
+from collections import OrderedDict
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import List, Optional, Tuple
 
 import httpx
+import orjson
 from dotenv import load_dotenv
-from fastapi import APIRouter, FastAPI, HTTPException, Request
-from motor.motor_asyncio import AsyncIOMotorClient
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, FastAPI, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, Field, TypeAdapter
+from pymongo.errors import PyMongoError
 from starlette.middleware.cors import CORSMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from ai_agents.agents import AgentConfig, ChatAgent, SearchAgent
 
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / ".env")
+
+# Motor sizes its executor from this at import time; a small pool avoids thread contention.
+os.environ.setdefault("MOTOR_MAX_WORKERS", "4")
+
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+
 
 logging.basicConfig(
     level=logging.INFO,
@@ -24,19 +40,107 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-ROOT_DIR = Path(__file__).parent
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    mongo_url: str
+    db_name: str
+    pendle_cache_ttl: float
+    pendle_concurrency: int
+    chat_concurrency: int
+    search_concurrency: int
+    cors_origins: Tuple[str, ...]
+
+
+@lru_cache(maxsize=1)
+def settings() -> Settings:
+    """Read and validate backend configuration from the environment once."""
+    mongo_url = os.getenv("MONGO_URL")
+    db_name = os.getenv("DB_NAME")
+
+    if not mongo_url or not db_name:
+        missing = [name for name, value in {"MONGO_URL": mongo_url, "DB_NAME": db_name}.items() if not value]
+        raise RuntimeError(f"Missing required environment variables: {', '.join(missing)}")
+
+    return Settings(
+        mongo_url=mongo_url,
+        db_name=db_name,
+        pendle_cache_ttl=float(os.getenv("PENDLE_CACHE_TTL", "30")),
+        pendle_concurrency=int(os.getenv("PENDLE_CONCURRENCY", "8")),
+        chat_concurrency=int(os.getenv("CHAT_CONCURRENCY", "16")),
+        search_concurrency=int(os.getenv("SEARCH_CONCURRENCY", "4")),
+        cors_origins=tuple(origin.strip() for origin in os.getenv("CORS_ORIGINS", "*").split(",") if origin.strip()),
+    )
+
+
+# Surface configuration errors at import time, before any worker starts serving.
+settings()
+
+
+class ORJSONUTCResponse(ORJSONResponse):
+    """ORJSONResponse that renders datetimes as UTC with a trailing ``Z``."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z,
+        )
+
+
+class UnhandledErrorMiddleware:
+    """Turn uncaught exceptions into a JSON 500 that still passes through CORSMiddleware.
+
+    Starlette runs ``@app.exception_handler(Exception)`` in its outermost middleware,
+    where responses bypass CORS and browsers only see an opaque network error.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            if response_started:
+                raise
+            logger.exception(f"Unhandled error in {scope['method']} {scope['path']}")
+            response = ORJSONUTCResponse({"success": False, "error": str(exc)}, status_code=500)
+            await response(scope, receive, send)
+
+
+_HELLO_BODY = orjson.dumps({"message": "Hello World"})
 
 
 class StatusCheck(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     client_name: str
-    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: datetime = Field(default_factory=partial(datetime.now, timezone.utc))
 
 
 class StatusCheckCreate(BaseModel):
     client_name: str
 
 
+class StatusCheckBulkCreate(BaseModel):
+    items: List[StatusCheckCreate]
+
+
+class StatusCheckBulkResponse(BaseModel):
+    ids: List[str]
+
+
 class ChatRequest(BaseModel):
     message: str
     agent_type: str = "chat"
@@ -88,57 +192,99 @@ class VaultsResponse(BaseModel):
     error: Optional[str] = None
 
 
-def _ensure_db(request: Request):
-    try:
-        return request.app.state.db
-    except AttributeError as exc:  # pragma: no cover - defensive
-        raise HTTPException(status_code=503, detail="Database not ready") from exc
+class ChainVaultsResult(BaseModel):
+    chain_id: int
+    result: VaultsResponse
 
 
-def _get_agent_cache(request: Request) -> Dict[str, object]:
-    if not hasattr(request.app.state, "agent_cache"):
-        request.app.state.agent_cache = {}
-    return request.app.state.agent_cache
+PREFETCH_CHAIN_IDS = (1, 10, 42161, 56, 8453)
+VAULTS_CACHE_SIZE = 64
+VAULT_DETAIL_CACHE_SIZE = 512
+MAX_BATCH_CHAIN_IDS = 20
 
+STATUS_LIST_ADAPTER = TypeAdapter(List[StatusCheck])
+VAULT_LIST_ADAPTER = TypeAdapter(List[VaultData])
 
-async def _get_or_create_agent(request: Request, agent_type: str):
-    cache = _get_agent_cache(request)
-    if agent_type in cache:
-        return cache[agent_type]
 
-    config: AgentConfig = request.app.state.agent_config
+async def _get_agent(request: Request, agent_type: str):
+    try:
+        agent = request.app.state.agent_cache[agent_type]
+    except KeyError:
+        raise HTTPException(status_code=400, detail=f"Unknown agent type '{agent_type}'") from None
 
     if agent_type == "search":
-        cache[agent_type] = SearchAgent(config)
-    elif agent_type == "chat":
-        cache[agent_type] = ChatAgent(config)
-    else:
-        raise HTTPException(status_code=400, detail=f"Unknown agent type '{agent_type}'")
+        # Wait for the startup MCP connection rather than racing it with a second one.
+        await asyncio.shield(request.app.state.search_mcp_setup)
+    return agent
 
-    return cache[agent_type]
 
+def _memoize_capabilities(app: FastAPI) -> None:
+    # Capabilities only change during MCP setup, so compute them once per setup.
+    app.state.agent_capabilities = {
+        agent_type: tuple(agent.get_capabilities()) for agent_type, agent in app.state.agent_cache.items()
+    }
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    load_dotenv(ROOT_DIR / ".env")
 
-    mongo_url = os.getenv("MONGO_URL")
-    db_name = os.getenv("DB_NAME")
+async def _setup_search_mcp(app: FastAPI) -> None:
+    """Connect the search agent's MCP tools off the startup path, then refresh capabilities."""
+    await app.state.agent_cache["search"].setup_web_search_mcp()
+    _memoize_capabilities(app)
 
-    if not mongo_url or not db_name:
-        missing = [name for name, value in {"MONGO_URL": mongo_url, "DB_NAME": db_name}.items() if not value]
-        raise RuntimeError(f"Missing required environment variables: {', '.join(missing)}")
 
-    client = AsyncIOMotorClient(mongo_url)
+async def _ensure_indexes(db) -> None:
+    try:
+        await db.status_checks.create_index("timestamp")
+        await db.status_checks.create_index("id")
+    except PyMongoError as exc:
+        logger.warning(f"Could not ensure status_checks indexes: {exc}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    config = settings()
+
+    client = AsyncIOMotorClient(config.mongo_url)
+    http_client = httpx.AsyncClient(
+        timeout=30.0,
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=30),
+    )
+    background_tasks: List[asyncio.Task] = []
 
     try:
         app.state.mongo_client = client
-        app.state.db = client[db_name]
+        app.state.db = client[config.db_name]
+        # Index creation waits on server selection, so it must not hold up startup.
+        background_tasks.append(asyncio.create_task(_ensure_indexes(app.state.db)))
         app.state.agent_config = AgentConfig()
-        app.state.agent_cache = {}
+        app.state.agent_cache = {
+            "chat": ChatAgent(app.state.agent_config),
+            "search": SearchAgent(app.state.agent_config),
+        }
+        _memoize_capabilities(app)
+        # The MCP handshake can take up to its transport timeout, so it must not hold up startup.
+        app.state.search_mcp_setup = asyncio.create_task(_setup_search_mcp(app))
+        background_tasks.append(app.state.search_mcp_setup)
+        # Bound in-flight LLM calls per agent type; excess requests wait for a slot.
+        app.state.agent_sem = {
+            "chat": asyncio.Semaphore(config.chat_concurrency),
+            "search": asyncio.Semaphore(config.search_concurrency),
+        }
+        app.state.http_client = http_client
+        app.state.vaults_cache = OrderedDict()
+        app.state.vaults_cache_ttl = config.pendle_cache_ttl
+        app.state.vaults_inflight = {}
+        app.state.vault_detail_cache = OrderedDict()
+        app.state.vault_detail_inflight = {}
+        app.state.vault_sem = asyncio.Semaphore(config.pendle_concurrency)
+        background_tasks.append(asyncio.create_task(_prefetch_vaults_loop(app)))
         logger.info("AI Agents API starting up")
         yield
     finally:
+        for task in background_tasks:
+            task.cancel()
+        await asyncio.gather(*background_tasks, return_exceptions=True)
+        await http_client.aclose()
         client.close()
         logger.info("AI Agents API shutdown complete")
 
@@ -146,152 +292,163 @@ async def lifespan(app: FastAPI):
 app = FastAPI(
     title="AI Agents API",
     description="Minimal AI Agents API with LangGraph and MCP support",
+    default_response_class=ORJSONUTCResponse,
     lifespan=lifespan,
 )
 
+
 api_router = APIRouter(prefix="/api")
 
 
 @api_router.get("/")
 async def root():
-    return {"message": "Hello World"}
+    return Response(content=_HELLO_BODY, media_type="application/json")
+
 
+def _new_status_doc(item: StatusCheckCreate) -> dict:
+    # The input is already validated; model_construct only fills in id and timestamp.
+    return StatusCheck.model_construct(**item.model_dump()).model_dump()
 
-@api_router.post("/status", response_model=StatusCheck)
+
+@api_router.post("/status", responses={200: {"model": StatusCheck}})
 async def create_status_check(input: StatusCheckCreate, request: Request):
-    db = _ensure_db(request)
-    status_obj = StatusCheck(**input.model_dump())
-    await db.status_checks.insert_one(status_obj.model_dump())
-    return status_obj
+    db = request.app.state.db
+    doc = _new_status_doc(input)
+    await db.status_checks.insert_one(doc)
+    doc.pop("_id", None)
+    return ORJSONUTCResponse(doc)
+
+
+@api_router.post("/status/bulk", response_model=StatusCheckBulkResponse)
+async def create_status_checks_bulk(body: StatusCheckBulkCreate, request: Request):
+    """Insert many status checks with a single insert_many round-trip."""
+    docs = [_new_status_doc(item) for item in body.items]
+    if docs:
+        db = request.app.state.db
+        await db.status_checks.insert_many(docs, ordered=False, bypass_document_validation=True)
+    return StatusCheckBulkResponse(ids=[doc["id"] for doc in docs])
 
 
-@api_router.get("/status", response_model=List[StatusCheck])
+@api_router.get("/status", responses={200: {"model": List[StatusCheck]}})
 async def get_status_checks(request: Request):
-    db = _ensure_db(request)
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+    db = request.app.state.db
+    cursor = (
+        db.status_checks.find({}, projection={"_id": 0, "id": 1, "client_name": 1, "timestamp": 1})
+        .sort("timestamp", -1)
+        .limit(1000)
+    )
+    status_checks = STATUS_LIST_ADAPTER.validate_python([doc async for doc in cursor])
+    # dump_python keeps datetime objects, so ORJSONUTCResponse can render Mongo's naive UTC with a Z suffix.
+    return ORJSONUTCResponse(STATUS_LIST_ADAPTER.dump_python(status_checks))
 
 
 @api_router.post("/chat", response_model=ChatResponse)
 async def chat_with_agent(chat_request: ChatRequest, request: Request):
-    try:
-        agent = await _get_or_create_agent(request, chat_request.agent_type)
+    agent = await _get_agent(request, chat_request.agent_type)
+    async with request.app.state.agent_sem[chat_request.agent_type]:
         response = await agent.execute(chat_request.message)
 
-        return ChatResponse(
-            success=response.success,
-            response=response.content,
-            agent_type=chat_request.agent_type,
-            capabilities=agent.get_capabilities(),
-            metadata=response.metadata,
-            error=response.error,
-        )
-    except HTTPException:
-        raise
-    except Exception as exc:  # pragma: no cover - defensive
-        logger.exception("Error in chat endpoint")
-        return ChatResponse(
-            success=False,
-            response="",
-            agent_type=chat_request.agent_type,
-            capabilities=[],
-            error=str(exc),
-        )
+    return ChatResponse(
+        success=response.success,
+        response=response.content,
+        agent_type=chat_request.agent_type,
+        capabilities=list(request.app.state.agent_capabilities[chat_request.agent_type]),
+        metadata=response.metadata,
+        error=response.error,
+    )
 
 
 @api_router.post("/search", response_model=SearchResponse)
 async def search_and_summarize(search_request: SearchRequest, request: Request):
-    try:
-        search_agent = await _get_or_create_agent(request, "search")
-        search_prompt = (
-            f"Search for information about: {search_request.query}. "
-            "Provide a comprehensive summary with key findings."
-        )
+    search_agent = await _get_agent(request, "search")
+    search_prompt = (
+        f"Search for information about: {search_request.query}. "
+        "Provide a comprehensive summary with key findings."
+    )
+    async with request.app.state.agent_sem["search"]:
         result = await search_agent.execute(search_prompt, use_tools=True)
 
-        if result.success:
-            metadata = result.metadata or {}
-            return SearchResponse(
-                success=True,
-                query=search_request.query,
-                summary=result.content,
-                search_results=metadata,
-                sources_count=int(metadata.get("tool_run_count", metadata.get("tools_used", 0)) or 0),
-            )
-
+    if result.success:
+        metadata = result.metadata or {}
         return SearchResponse(
-            success=False,
-            query=search_request.query,
-            summary="",
-            sources_count=0,
-            error=result.error,
-        )
-    except HTTPException:
-        raise
-    except Exception as exc:  # pragma: no cover - defensive
-        logger.exception("Error in search endpoint")
-        return SearchResponse(
-            success=False,
+            success=True,
             query=search_request.query,
-            summary="",
-            sources_count=0,
-            error=str(exc),
+            summary=result.content,
+            search_results=metadata,
+            sources_count=int(metadata.get("tool_run_count", metadata.get("tools_used", 0)) or 0),
         )
 
+    return SearchResponse(
+        success=False,
+        query=search_request.query,
+        summary="",
+        sources_count=0,
+        error=result.error,
+    )
+
 
 @api_router.get("/agents/capabilities")
 async def get_agent_capabilities(request: Request):
+    capabilities = request.app.state.agent_capabilities
+
+    return {
+        "success": True,
+        "capabilities": {
+            "search_agent": capabilities["search"],
+            "chat_agent": capabilities["chat"],
+        },
+    }
+
+
+def _vault_row(market: dict, chain_id: int) -> dict:
+    details = market.get("details") or {}
+    return {
+        "address": market.get("address", ""),
+        "name": market.get("name", "Unknown"),
+        "symbol": market.get("symbol", ""),
+        "expiry": market.get("expiry", ""),
+        "chain_id": chain_id,
+        "volume_24h": float(details.get("volume24h", 0)),
+        "liquidity": float(details.get("liquidity", 0)),
+        "implied_apy": float(details.get("impliedApy", 0)),
+        "underlying_apy": float(details.get("underlyingApy", 0)),
+        "lp_apy": float(details.get("lpApy", 0)),
+        "pt_price": float(details.get("ptPrice", 0)),
+        "yt_price": float(details.get("ytPrice", 0)),
+    }
+
+
+def _parse_vaults(markets: List[dict], chain_id: int) -> List[VaultData]:
+    """Validate all markets in one batch, falling back to per-market parsing on bad rows."""
     try:
-        search_agent = await _get_or_create_agent(request, "search")
-        chat_agent = await _get_or_create_agent(request, "chat")
-
-        return {
-            "success": True,
-            "capabilities": {
-                "search_agent": search_agent.get_capabilities(),
-                "chat_agent": chat_agent.get_capabilities(),
-            },
-        }
-    except HTTPException:
-        raise
-    except Exception as exc:  # pragma: no cover - defensive
-        logger.exception("Error getting capabilities")
-        return {"success": False, "error": str(exc)}
-
-
-@api_router.get("/vaults", response_model=VaultsResponse)
-async def get_pendle_vaults(chain_id: int = 1):
-    """Fetch all active Pendle vaults (markets) from Pendle API."""
+        return VAULT_LIST_ADAPTER.validate_python([_vault_row(market, chain_id) for market in markets])
+    except (ValueError, TypeError, KeyError, AttributeError):
+        pass
+
+    vaults = []
+    for market in markets:
+        try:
+            vaults.append(VaultData(**_vault_row(market, chain_id)))
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            address = market.get("address") if isinstance(market, dict) else None
+            logger.warning(f"Error parsing vault data for {address}: {e}")
+            continue
+    return vaults
+
+
+async def _fetch_pendle_vaults(client: httpx.AsyncClient, chain_id: int) -> VaultsResponse:
+    """Fetch and parse the active Pendle markets for a single chain."""
     try:
         pendle_api_url = f"https://api-v2.pendle.finance/core/v1/{chain_id}/markets/active"
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(pendle_api_url)
-            response.raise_for_status()
-            data = response.json()
-
-        vaults = []
-        for market in data.get("markets", []):
-            try:
-                details = market.get("details", {})
-                vault = VaultData(
-                    address=market.get("address", ""),
-                    name=market.get("name", "Unknown"),
-                    symbol=market.get("symbol", ""),
-                    expiry=market.get("expiry", ""),
-                    chain_id=chain_id,
-                    volume_24h=float(details.get("volume24h", 0)),
-                    liquidity=float(details.get("liquidity", 0)),
-                    implied_apy=float(details.get("impliedApy", 0)),
-                    underlying_apy=float(details.get("underlyingApy", 0)),
-                    lp_apy=float(details.get("lpApy", 0)),
-                    pt_price=float(details.get("ptPrice", 0)),
-                    yt_price=float(details.get("ytPrice", 0)),
-                )
-                vaults.append(vault)
-            except (ValueError, TypeError, KeyError) as e:
-                logger.warning(f"Error parsing vault data for {market.get('address')}: {e}")
-                continue
+        response = await client.get(pendle_api_url)
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+        markets = data.get("markets", []) if isinstance(data, dict) else None
+        if not isinstance(markets, list):
+            raise ValueError("Unexpected markets payload from Pendle API")
+
+        vaults = _parse_vaults(markets, chain_id)
 
         return VaultsResponse(
             success=True,
@@ -299,7 +456,8 @@ async def get_pendle_vaults(chain_id: int = 1):
             total=len(vaults),
         )
 
-    except httpx.HTTPError as exc:
+    # orjson.JSONDecodeError is a ValueError, so malformed bodies land here too.
+    except (httpx.HTTPError, ValueError) as exc:
         logger.exception("Error fetching vaults from Pendle API")
         return VaultsResponse(
             success=False,
@@ -307,31 +465,154 @@ async def get_pendle_vaults(chain_id: int = 1):
             total=0,
             error=f"Failed to fetch vaults: {str(exc)}",
         )
-    except Exception as exc:
-        logger.exception("Unexpected error in get_vaults")
-        return VaultsResponse(
-            success=False,
-            vaults=[],
-            total=0,
-            error=str(exc),
+
+
+def _cached_vaults(app: FastAPI, chain_id: int) -> Optional[bytes]:
+    cache = app.state.vaults_cache
+    entry = cache.get(chain_id)
+    if entry is None:
+        return None
+    if entry[0] <= time.monotonic():
+        del cache[chain_id]
+        return None
+    cache.move_to_end(chain_id)
+    return entry[1]
+
+
+async def _refresh_vaults(app: FastAPI, chain_id: int) -> bytes:
+    try:
+        async with app.state.vault_sem:
+            result = await _fetch_pendle_vaults(app.state.http_client, chain_id)
+        # Encode once here so cache hits hand out bytes without re-serializing.
+        body = result.model_dump_json().encode()
+        if result.success:
+            # chain_id comes from the client, so bound the cache like the detail LRU.
+            cache = app.state.vaults_cache
+            cache[chain_id] = (time.monotonic() + app.state.vaults_cache_ttl, body)
+            cache.move_to_end(chain_id)
+            while len(cache) > VAULTS_CACHE_SIZE:
+                cache.popitem(last=False)
+        return body
+    finally:
+        app.state.vaults_inflight.pop(chain_id, None)
+
+
+def _vaults_inflight(app: FastAPI, chain_id: int) -> "asyncio.Future[bytes]":
+    inflight = app.state.vaults_inflight
+    future = inflight.get(chain_id)
+    if future is None:
+        future = inflight[chain_id] = asyncio.ensure_future(_refresh_vaults(app, chain_id))
+    return future
+
+
+async def _get_vaults(app: FastAPI, chain_id: int) -> bytes:
+    cached = _cached_vaults(app, chain_id)
+    if cached is not None:
+        return cached
+
+    # Concurrent misses for the same chain share one upstream fetch; shielding
+    # keeps a disconnecting caller from cancelling it for everyone else.
+    return await asyncio.shield(_vaults_inflight(app, chain_id))
+
+
+async def _prefetch_vaults_loop(app: FastAPI) -> None:
+    """Keep the vaults cache warm for popular chains so user requests are cache hits."""
+    ttl = app.state.vaults_cache_ttl
+    if ttl <= 0 or not PREFETCH_CHAIN_IDS:
+        return
+    # Refreshing at half the TTL leaves the other half for a slow upstream fetch to
+    # finish before the previous entry expires.
+    interval = ttl / 2
+    while True:
+        try:
+            await asyncio.gather(*(_vaults_inflight(app, chain_id) for chain_id in PREFETCH_CHAIN_IDS))
+        except Exception:  # pragma: no cover - defensive
+            logger.exception("Error prefetching Pendle vaults")
+        await asyncio.sleep(interval)
+
+
+# The vault endpoints serialize their already-validated models directly; declaring
+# the schema through `responses` keeps OpenAPI intact without FastAPI re-validating.
+@api_router.get("/vaults", responses={200: {"model": VaultsResponse}})
+async def get_pendle_vaults(request: Request, chain_id: int = 1):
+    """Fetch all active Pendle vaults (markets) from Pendle API."""
+    body = await _get_vaults(request.app, chain_id)
+    return Response(content=body, media_type="application/json")
+
+
+@api_router.get("/vaults/batch", responses={200: {"model": List[ChainVaultsResult]}})
+async def get_pendle_vaults_batch(request: Request, chain_ids: str = "1"):
+    """Fetch active Pendle vaults for several comma-separated chain ids concurrently."""
+    try:
+        ids = list(dict.fromkeys(int(chain_id) for chain_id in chain_ids.split(",") if chain_id.strip()))
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=400,
+            detail="chain_ids must be a comma-separated list of integers",
+        ) from exc
+    if len(ids) > MAX_BATCH_CHAIN_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"chain_ids accepts at most {MAX_BATCH_CHAIN_IDS} chains",
         )
 
+    bodies = await asyncio.gather(*(_get_vaults(request.app, chain_id) for chain_id in ids))
+    # Splice the cached per-chain JSON into the ChainVaultsResult list shape.
+    entries = (b'{"chain_id":%d,"result":%b}' % (chain_id, body) for chain_id, body in zip(ids, bodies))
+    return Response(content=b"[" + b",".join(entries) + b"]", media_type="application/json")
 
-@api_router.get("/vaults/{vault_address}")
-async def get_vault_details(vault_address: str, chain_id: int = 1):
-    """Fetch detailed information for a specific Pendle vault."""
+
+def _cached_vault_detail(app: FastAPI, key: Tuple[int, str]) -> Optional[bytes]:
+    cache = app.state.vault_detail_cache
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    if entry[0] <= time.monotonic():
+        del cache[key]
+        return None
+    cache.move_to_end(key)
+    return entry[1]
+
+
+async def _refresh_vault_detail(app: FastAPI, key: Tuple[int, str]) -> bytes:
+    chain_id, vault_address = key
     try:
         pendle_api_url = f"https://api-v2.pendle.finance/core/v2/{chain_id}/markets/{vault_address}/data"
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(pendle_api_url)
-            response.raise_for_status()
-            data = response.json()
+        async with app.state.vault_sem:
+            response = await app.state.http_client.get(pendle_api_url)
+        response.raise_for_status()
+        body = orjson.dumps({"success": True, "data": orjson.loads(response.content)})
+
+        cache = app.state.vault_detail_cache
+        cache[key] = (time.monotonic() + app.state.vaults_cache_ttl, body)
+        cache.move_to_end(key)
+        while len(cache) > VAULT_DETAIL_CACHE_SIZE:
+            cache.popitem(last=False)
+        return body
+    finally:
+        app.state.vault_detail_inflight.pop(key, None)
 
-        return {
-            "success": True,
-            "data": data,
-        }
+
+def _vault_detail_inflight(app: FastAPI, key: Tuple[int, str]) -> "asyncio.Future[bytes]":
+    inflight = app.state.vault_detail_inflight
+    future = inflight.get(key)
+    if future is None:
+        future = inflight[key] = asyncio.ensure_future(_refresh_vault_detail(app, key))
+    return future
+
+
+@api_router.get("/vaults/{vault_address}")
+async def get_vault_details(vault_address: str, request: Request, chain_id: int = 1):
+    """Fetch detailed information for a specific Pendle vault."""
+    key = (chain_id, vault_address.lower())
+    body = _cached_vault_detail(request.app, key)
+    if body is not None:
+        return Response(content=body, media_type="application/json")
+
+    try:
+        body = await asyncio.shield(_vault_detail_inflight(request.app, key))
+        return Response(content=body, media_type="application/json")
 
     except httpx.HTTPError as exc:
         logger.exception(f"Error fetching vault details for {vault_address}")
@@ -339,20 +620,19 @@ async def get_vault_details(vault_address: str, chain_id: int = 1):
             status_code=500,
             detail=f"Failed to fetch vault details: {str(exc)}",
         )
-    except Exception as exc:
-        logger.exception(f"Unexpected error fetching vault {vault_address}")
-        raise HTTPException(
-            status_code=500,
-            detail=str(exc),
-        )
 
 
-app.include_router(api_router)
+# Registered before CORSMiddleware so it sits inside it and error responses keep CORS headers.
+app.add_middleware(UnhandledErrorMiddleware)
 
+# No endpoint relies on cookies, so credentials stay off: with the default "*" Starlette
+# can answer with a literal wildcard instead of echoing each request's Origin.
 app.add_middleware(
     CORSMiddleware,
-    allow_credentials=True,
-    allow_origins=["*"],
+    allow_credentials=False,
+    allow_origins=settings().cors_origins,
     allow_methods=["*"],
     allow_headers=["*"],
 )
+
+app.include_router(api_router)
@@ -45,3 +45,48 @@ def test_capabilities_endpoint():
     assert data["success"] is True
     assert "search_agent" in data["capabilities"]
     assert "chat_agent" in data["capabilities"]
+
+
+def test_vaults_batch_endpoint():
+    response = requests.get(f"{BASE_URL}/vaults/batch", params={"chain_ids": "1,42161"})
+    response.raise_for_status()
+    data = response.json()
+    assert [entry["chain_id"] for entry in data] == [1, 42161]
+    for entry in data:
+        result = entry["result"]
+        assert result["success"] is True
+        assert result["total"] == len(result["vaults"])
+
+
+def test_vaults_batch_rejects_invalid_chain_ids():
+    response = requests.get(f"{BASE_URL}/vaults/batch", params={"chain_ids": "abc"})
+    assert response.status_code == 400
+
+
+def test_status_bulk_endpoint():
+    payload = {"items": [{"client_name": "bulk-a"}, {"client_name": "bulk-b"}]}
+    response = requests.post(f"{BASE_URL}/status/bulk", json=payload)
+    response.raise_for_status()
+    ids = response.json()["ids"]
+    assert len(ids) == 2
+    assert len(set(ids)) == 2
+
+
+def test_status_bulk_endpoint_empty():
+    response = requests.post(f"{BASE_URL}/status/bulk", json={"items": []})
+    response.raise_for_status()
+    assert response.json() == {"ids": []}
+
+
+def test_status_create_then_list():
+    response = requests.post(f"{BASE_URL}/status", json={"client_name": "status-roundtrip"})
+    response.raise_for_status()
+    created = response.json()
+    assert created["client_name"] == "status-roundtrip"
+    assert created["timestamp"].endswith("Z")
+
+    response = requests.get(f"{BASE_URL}/status")
+    response.raise_for_status()
+    checks = response.json()
+    assert any(check["id"] == created["id"] for check in checks)
+    assert all(check["timestamp"].endswith("Z") for check in checks)